@@ -14,8 +14,10 @@ to include automatic serial port detection for the ESP32.
 1.  **Install Python:**
     Ensure you have Python 3.9 or newer installed on your system.
 
-2.  **Install FFmpeg:**
-    The Whisper model for audio transcription requires FFmpeg.
+2.  **Install FFmpeg (optional):**
+    Audio transcription uses faster-whisper, which decodes audio with the
+    bundled PyAV library, so FFmpeg is no longer required for transcription.
+    It is still recommended for librosa to read compressed formats (e.g. MP3).
     -   **Windows:** Install via a package manager like Chocolatey (`choco install ffmpeg`)
         or download from https://ffmpeg.org/download.html and add it to your system's PATH.
     -   **macOS:** Install via Homebrew: `brew install ffmpeg`
@@ -43,7 +45,13 @@ to include automatic serial port detection for the ESP32.
     }
     ```
 
-5.  **Run the Application:**
+5.  **(Optional) Quantize the Models:**
+    Run `python quantize_models.py --samples DIR` once to write int8 `.tflite`
+    versions of the models into `saved_models/`, calibrated on the photos,
+    recordings and ESP32 logs in DIR. They are used automatically when present
+    and re-quantizing is needed after a model is retrained.
+
+6.  **Run the Application:**
     Navigate to the script's directory in your terminal and run:
     `python your_script_name.py`
 
@@ -59,27 +67,80 @@ import tensorflow as tf
 import pickle
 import joblib
 import librosa
+import soundfile as sf
 from datetime import datetime
 import requests
 import re
-import whisper
+from faster_whisper import WhisperModel
+import ctranslate2
 from gtts import gTTS
 import tempfile
+import io
+import hashlib
 import json
+import orjson
 from pathlib import Path
 import time
+import threading
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque, defaultdict
+
+# Optional GPU inference backend: Keras -> ONNX -> TensorRT (FP16).
+# Falls back to plain Keras inference when any of these are unavailable.
+try:
+    import tf2onnx
+    import tensorrt as trt
+    import pycuda.driver as cuda
+except Exception:
+    trt = None
 
 # === Configuration & Cross-Platform Path Setup ===
 BASE_DIR = Path(__file__).parent.resolve()
 MODELS_DIR = BASE_DIR / "saved_models"
 STATIC_DIR = BASE_DIR / "static"
+TTS_CACHE_DIR = BASE_DIR / ".tts_cache"
+TTS_CACHE_MAX_AGE = 24 * 60 * 60 # Seconds before a cached TTS clip is synthesized again
+TTS_CACHE_MAX_BYTES = 50 * 1024 * 1024 # Oldest cached TTS clips are deleted beyond this total size
 OLLAMA_API_URL = "http://localhost:11434"
 OLLAMA_MODEL_NAME = "phi3:mini"
+AUDIO_SAMPLE_RATE = 22050
+PROBE_TIMEOUT = 1.5 # Seconds to wait for the "PONG" handshake reply
+MFCC_SHAPE = (38, 98) # (n_mfcc, frames) computed from recordings; audio_model.h5 expects (40, 100), see get_model_runner()
+USE_GPU_MFCC = os.environ.get("SAFESPACE_GPU_MFCC") == "1" # Opt-in: set only once check_mfcc_parity.py passes on this host
+NUMPY_MODELS = ("dass21_model", "physio_model") # Small MLPs served by NumpyMLP instead of a framework
+PHYSIO_KEYS = ("eda_raw", "bvp_ir_raw", "temp_c", "acc_x_raw", "acc_y_raw", "acc_z_raw") # Physio model input order
+SENTENCE_END = re.compile(r'(?<=[^\W\d_][.!?])\s+') # Sentence boundaries for streaming TTS ("1." is not one)
+TRT_LOGGER = trt.Logger(trt.Logger.WARNING) if trt else None
+
+# === TensorFlow Runtime Configuration ===
+# The four modality predictions run concurrently, so cap TF's per-op thread
+# pool at half the cores instead of letting every op grab all of them, and
+# keep OpenCV's tiny 48x48 resize single-threaded to avoid oversubscription.
+CPU_COUNT = os.cpu_count() or 1
+tf.config.threading.set_intra_op_parallelism_threads(max(2, CPU_COUNT // 2))
+tf.config.threading.set_inter_op_parallelism_threads(2)
+cv2.setNumThreads(1)
+
+# XLA fuses the small conv/dense graphs into few kernels. (TF32 tensor-core
+# math for float32 on Ampere+ GPUs is already on by default since TF 2.4.)
+tf.config.optimizer.set_jit(True)
+
+# TF would otherwise reserve nearly all GPU memory up front, leaving none for
+# torchaudio (GPU MFCCs) or TensorRT, which share the device.
+for gpu in tf.config.list_physical_devices('GPU'):
+    tf.config.experimental.set_memory_growth(gpu, True)
 
 # === Global State ===
 sensor_log = {}
+OLLAMA_SESSION = requests.Session() # Reuses the TCP connection to Ollama across reports
+OLLAMA_SESSION.headers.update({"Connection": "keep-alive"})
 latest_line = ""
 bt_serial = None # Will be initialized by the Gradio interface
+sensor_readings = deque(maxlen=1024) # (received_at, parsed data, raw line) from the current connection's reader
+sensor_readings_lock = threading.Lock() # Makes scan_bt_data()'s take-newest-and-clear atomic w.r.t. the reader
+serial_reader_error = None # Set by serial_reader_loop() if the connection fails
 
 # === Helper Functions for Serial Communication ===
 def list_serial_ports():
@@ -87,39 +148,94 @@ def list_serial_ports():
     ports = serial.tools.list_ports.comports()
     return [port.device for port in ports]
 
+def probe_port(port, timeout=PROBE_TIMEOUT):
+    """
+    Returns True if the device on `port` answers "PING" with "PONG".
+    DTR/RTS are held low while opening the port so the ESP32 is not reset
+    and can answer immediately. PING is re-sent every 0.25s (in case a board
+    resets anyway and is still booting) while polling for a reply every 50ms,
+    for at most `timeout` seconds.
+    """
+    ser = serial.Serial()
+    ser.port, ser.baudrate, ser.timeout, ser.write_timeout = port, 115200, 0, 1
+    ser.dtr = ser.rts = False
+    with ser:
+        ser.reset_input_buffer()
+        received = b""
+        next_ping = start = time.monotonic()
+        while time.monotonic() - start < timeout:
+            if time.monotonic() >= next_ping:
+                ser.write(b'PING\n')
+                next_ping += 0.25
+            if ser.in_waiting:
+                received += ser.read(ser.in_waiting)
+                if any(line.strip() == b"PONG" for line in received.splitlines()):
+                    return True
+            time.sleep(0.05)
+    return False
+
 def auto_detect_esp32_port():
     """
     Scans all available serial ports and performs a handshake to find the ESP32.
-    Sends "PING" and expects "PONG" in response.
+    Sends "PING" and expects "PONG" in response. Ports are probed in parallel,
+    and progress is reported as each probe finishes.
     """
-    ports = list_serial_ports()
+    # The connected port is being drained by its reader thread, so probing it would
+    # steal (and corrupt) sensor lines; it's already known to be the ESP32 anyway.
+    connected_port = bt_serial.port if bt_serial and bt_serial.is_open else None
+    ports = [port for port in list_serial_ports() if port != connected_port]
     if not ports:
-        return "No serial ports found.", None
-
-    for port in ports:
-        yield f"Testing port: {port}...", None
-        try:
-            ser = serial.Serial(port, 115200, timeout=1, write_timeout=1)
-            time.sleep(2) 
-            ser.write(b'PING\n')
-            response = ser.readline().decode('utf-8').strip()
-            ser.close()
-
-            if response == "PONG":
+        yield "No serial ports found." if connected_port is None else f"No serial ports found besides the connected {connected_port}.", None
+        return
+
+    yield f"Testing port(s): {', '.join(ports)}...", None
+    with ThreadPoolExecutor(max_workers=len(ports)) as executor:
+        futures = {executor.submit(probe_port, port): port for port in ports}
+        for future in as_completed(futures):
+            port = futures[future]
+            try:
+                found = future.result()
+            except Exception:
+                yield f"Error on {port}. Skipping.", None
+                continue
+            if found:
                 yield f"✅ ESP32 found on {port}!", port
                 return
-        except (serial.SerialException, Exception) as e:
-            yield f"Error on {port}. Skipping.", None
-            continue
-            
+            yield f"No response on {port}.", None
+
     yield "❌ Auto-detection failed. Please select the port manually.", None
 
 
+def serial_reader_loop(ser, readings):
+    """
+    Background thread: reads JSON lines from `ser` into its connection's
+    `readings` deque until the port is closed, so no Gradio callback ever
+    blocks on serial I/O. Lines that aren't valid JSON (e.g. boot messages)
+    are skipped. Each connection gets a new deque, so a reader that is still
+    finishing a readline() after a reconnect can't mix in stale readings.
+    """
+    global serial_reader_error
+    while ser.is_open:
+        try:
+            line = ser.readline()
+        except Exception as e:
+            if ser.is_open and ser is bt_serial: serial_reader_error = e # Otherwise the port was closed on purpose
+            return
+        if not line: continue
+        line = line.decode('utf-8', errors='replace').strip()
+        try:
+            reading = (datetime.now(), orjson.loads(line), line)
+            with sensor_readings_lock: readings.append(reading)
+        except orjson.JSONDecodeError:
+            pass
+
 def connect_to_port(port_name):
-    """Connects to the selected serial port."""
-    global bt_serial
+    """Connects to the selected serial port and starts its background reader thread."""
+    global bt_serial, serial_reader_error, sensor_readings
     if bt_serial and bt_serial.is_open:
         bt_serial.close()
+    sensor_readings = deque(maxlen=1024)
+    serial_reader_error = None
 
     if not port_name:
         bt_serial = None
@@ -127,6 +243,7 @@ def connect_to_port(port_name):
 
     try:
         bt_serial = serial.Serial(port_name, 115200, timeout=2)
+        threading.Thread(target=serial_reader_loop, args=(bt_serial, sensor_readings), daemon=True).start()
         return f"[✓] Connected to {port_name} successfully!"
     except serial.SerialException as e:
         bt_serial = None
@@ -134,149 +251,586 @@ def connect_to_port(port_name):
 
 
 # === Model Loading Functions ===
-def load_models():
-    """Loads all Keras models."""
-    print(f"Loading models from: {MODELS_DIR}...")
+# Everything is loaded lazily on first use (and cached), so startup is fast
+# and only the modalities actually used in a session take up memory.
+def load_once(loader):
+    """
+    Like functools.cache, but safe to call from several threads at once: the
+    preload thread, the prepare_* workers and concurrent reports may all ask
+    for the same model, and only the first call per key runs `loader`. The
+    others wait for it instead of loading (or exporting) a second copy.
+    """
+    cached_loader = functools.cache(loader)
+    key_locks, key_locks_guard = defaultdict(threading.Lock), threading.Lock()
+
+    @functools.wraps(loader)
+    def wrapper(*args):
+        with key_locks_guard:
+            key_lock = key_locks[args]
+        with key_lock:
+            return cached_loader(*args)
+    return wrapper
+
+MODEL_FILES = {
+    "facial_model": "facial_model.h5",
+    "audio_model": "audio_model.h5",
+    "dass21_model": "dass211_model.h5",
+    "physio_model": "physio_model.h5",
+}
+# Input shape (without the batch dimension) the app's *_input() transforms produce for each model.
+MODEL_INPUT_SHAPES = {
+    "facial_model": (48, 48, 1),
+    "audio_model": MFCC_SHAPE + (1,),
+    "dass21_model": (21,),
+    "physio_model": (len(PHYSIO_KEYS),),
+}
+
+def model_fingerprint(name):
+    """Short hash of a model's .h5 file, used to key caches derived from it (.onnx/.plan/.tflite)."""
+    return hashlib.sha1((MODELS_DIR / MODEL_FILES[name]).read_bytes()).hexdigest()[:12]
+
+@load_once
+def load_keras_model(name):
+    """Loads one Keras model from MODELS_DIR. Returns None if it can't be loaded."""
+    print(f"Loading {name} from: {MODELS_DIR}...")
     try:
-        facial_model = tf.keras.models.load_model(MODELS_DIR / "facial_model.h5")
-        audio_model = tf.keras.models.load_model(MODELS_DIR / "audio_model.h5")
-        dass21_model = tf.keras.models.load_model(MODELS_DIR / "dass211_model.h5")
-        physio_model = tf.keras.models.load_model(MODELS_DIR / "physio_model.h5")
-        print("[✓] All Keras models loaded successfully.")
-        return facial_model, audio_model, dass21_model, physio_model
+        model = tf.keras.models.load_model(MODELS_DIR / MODEL_FILES[name])
+        print(f"[✓] Keras model {name} loaded successfully.")
+        return model
     except Exception as e:
-        print(f"[X] ERROR: Could not load one or more Keras models. Check paths/integrity. Error: {e}")
-        return None, None, None, None
+        print(f"[X] ERROR: Could not load Keras model {name}. Check paths/integrity. Error: {e}")
+        return None
 
-def load_scalers():
-    """Loads all scaler objects."""
+def scaler_coefficients(scaler):
+    """
+    Extracts a fitted StandardScaler as float32 (mean, 1 / scale) arrays, so
+    scaling is `(X - mean) * inv_scale` without sklearn's per-call validation.
+    """
+    n_features = scaler.n_features_in_
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+    return mean.astype(np.float32), (1.0 / scale).astype(np.float32)
+
+@load_once
+def load_dass21_scaler():
+    """Loads the DASS-21 scaler as (mean, inv_scale) coefficients."""
     try:
         with open(MODELS_DIR / "dass211_scaler.pkl", "rb") as f:
-            dass21_scaler = pickle.load(f)
-        physio_scaler = joblib.load(MODELS_DIR / 'physio_scaler.pkl')
-        print("[✓] All scalers loaded successfully.")
-        return dass21_scaler, physio_scaler
+            dass21_scaler = scaler_coefficients(pickle.load(f))
+        print("[✓] DASS-21 scaler loaded successfully.")
+        return dass21_scaler
     except Exception as e:
-        print(f"[X] ERROR: Could not load one or more scalers. Check paths/integrity. Error: {e}")
-        return None, None
+        print(f"[X] ERROR: Could not load DASS-21 scaler. Check paths/integrity. Error: {e}")
+        return None
 
+@load_once
+def load_physio_scaler():
+    """Loads the physiological data scaler as (mean, inv_scale) coefficients."""
+    try:
+        physio_scaler = scaler_coefficients(joblib.load(MODELS_DIR / 'physio_scaler.pkl'))
+        print("[✓] Physio scaler loaded successfully.")
+        return physio_scaler
+    except Exception as e:
+        print(f"[X] ERROR: Could not load physio scaler. Check paths/integrity. Error: {e}")
+        return None
+
+@load_once
 def load_whisper_model():
-    """Loads the OpenAI Whisper model."""
+    """
+    Loads the Whisper "base" model through faster-whisper (CTranslate2, int8
+    weights). GPUs compute in float16; CPUs can't run int8_float16 (CTranslate2
+    raises instead of falling back), so they use plain int8.
+    """
     try:
-        model = whisper.load_model("base")
-        print("[✓] OpenAI Whisper model loaded successfully.")
+        on_gpu = ctranslate2.get_cuda_device_count() > 0
+        model = WhisperModel("base", device="cuda" if on_gpu else "cpu", compute_type="int8_float16" if on_gpu else "int8")
+        print(f"[✓] faster-whisper model loaded successfully ({'GPU' if on_gpu else 'CPU'}).")
         return model
     except Exception as e:
-        print(f"[X] ERROR: Could not load OpenAI Whisper model. Is 'ffmpeg' installed and in PATH? Error: {e}")
+        print(f"[X] ERROR: Could not load faster-whisper model. Error: {e}")
         return None
 
-# Initialize all models on startup
-facial_model, audio_model, dass21_model, physio_model = load_models()
-dass21_scaler, physio_scaler = load_scalers()
-whisper_model = load_whisper_model()
+# === TensorRT Inference (GPU only) ===
+class TRTEngine:
+    """Runs a serialized TensorRT engine on single-sample inputs using pinned host buffers."""
+    def __init__(self, plan_path):
+        # Share the device's primary context with TensorFlow instead of creating
+        # a second one at import time; it's only touched once an engine is built.
+        cuda.init()
+        self.cuda_context = cuda.Device(0).retain_primary_context()
+        self.cuda_context.push()
+        try:
+            runtime = trt.Runtime(TRT_LOGGER)
+            self.engine = runtime.deserialize_cuda_engine(plan_path.read_bytes())
+            self.context = self.engine.create_execution_context()
+            self.stream = cuda.Stream()
+            self.host_in = cuda.pagelocked_empty(tuple(self.engine.get_binding_shape(0)), dtype=np.float32)
+            self.host_out = cuda.pagelocked_empty(tuple(self.engine.get_binding_shape(1)), dtype=np.float32)
+            self.dev_in = cuda.mem_alloc(self.host_in.nbytes)
+            self.dev_out = cuda.mem_alloc(self.host_out.nbytes)
+        finally:
+            self.cuda_context.pop()
+        self.lock = threading.Lock()
+
+    def __call__(self, x):
+        with self.lock:
+            # Gradio calls us from worker threads, so the CUDA context must be made current here.
+            self.cuda_context.push()
+            try:
+                np.copyto(self.host_in, np.reshape(x, self.host_in.shape))
+                cuda.memcpy_htod_async(self.dev_in, self.host_in, self.stream)
+                self.context.execute_async_v2(bindings=[int(self.dev_in), int(self.dev_out)], stream_handle=self.stream.handle)
+                cuda.memcpy_dtoh_async(self.host_out, self.dev_out, self.stream)
+                self.stream.synchronize()
+            finally:
+                self.cuda_context.pop()
+            return self.host_out.copy()
+
+def build_trt_engine(name):
+    """
+    Returns a TensorRT engine for model `name`, cached as MODELS_DIR/<name>-<hash>.plan.
+    On the first run the Keras model is converted to ONNX and built with FP16.
+    The cache is keyed on the .h5 contents, so a retrained model gets a new engine.
+    """
+    cache_stem = f"{name}-{model_fingerprint(name)}"
+    plan_path = MODELS_DIR / f"{cache_stem}.plan"
+    if not plan_path.exists():
+        model = load_keras_model(name)
+        if model is None:
+            raise RuntimeError(f"Keras model {name} is not available for export.")
+        onnx_path = MODELS_DIR / f"{cache_stem}.onnx"
+        input_spec = (tf.TensorSpec((1,) + tuple(model.input_shape[1:]), tf.float32, name="input"),)
+        tf2onnx.convert.from_keras(model, input_signature=input_spec, opset=15, output_path=str(onnx_path))
+        builder = trt.Builder(TRT_LOGGER)
+        network = builder.create_network(1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH))
+        parser = trt.OnnxParser(network, TRT_LOGGER)
+        if not parser.parse(onnx_path.read_bytes()):
+            raise RuntimeError(f"ONNX parse failed: {parser.get_error(0)}")
+        config = builder.create_builder_config()
+        if builder.platform_has_fast_fp16: config.set_flag(trt.BuilderFlag.FP16)
+        serialized_engine = builder.build_serialized_network(network, config)
+        if serialized_engine is None:
+            raise RuntimeError("TensorRT engine build failed.")
+        plan_path.write_bytes(serialized_engine)
+    return TRTEngine(plan_path)
+
+# === Quantized TFLite Inference (see quantize_models.py) ===
+class TFLiteModel:
+    """Runs a (quantized) TFLite flatbuffer on single-sample inputs with tensors allocated once."""
+    def __init__(self, model_path):
+        self.interpreter = tf.lite.Interpreter(model_path=str(model_path))
+        self.interpreter.allocate_tensors()
+        self.input_index = self.interpreter.get_input_details()[0]["index"]
+        self.output_index = self.interpreter.get_output_details()[0]["index"]
+        self.lock = threading.Lock()
+
+    def __call__(self, x):
+        with self.lock:
+            self.interpreter.set_tensor(self.input_index, np.asarray(x, dtype=np.float32))
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self.output_index)
+
+# === NumPy MLP Inference ===
+class NumpyMLP:
+    """
+    Runs a small Dense/BatchNormalization/Dropout Keras MLP as plain NumPy
+    matmuls. For the DASS-21 (21 inputs) and physio (6 inputs) models this is
+    a few hundred FLOPs, far below the cost of any framework dispatch.
+    Inference-mode BatchNormalization is an affine map, folded into the next
+    Dense layer. Raises ValueError for any other layer type.
+    """
+    ACTIVATIONS = {
+        "linear": lambda x: x,
+        "relu": lambda x: np.maximum(x, 0),
+        "sigmoid": lambda x: 0.5 * (1 + np.tanh(0.5 * x)), # Overflow-free sigmoid
+    }
+
+    def __init__(self, model):
+        self.layers = [] # (W, b, activation)
+        pending_scale, pending_shift = None, None # Unfolded BatchNormalization affine
+        for layer in model.layers:
+            kind, config, weights = type(layer).__name__, layer.get_config(), layer.get_weights()
+            if kind in ("InputLayer", "Dropout"): continue
+            if kind == "Dense":
+                if config["activation"] not in self.ACTIVATIONS:
+                    raise ValueError(f"unsupported activation '{config['activation']}'")
+                W = weights[0].astype(np.float32)
+                b = weights[1].astype(np.float32) if config["use_bias"] else np.zeros(W.shape[1], np.float32)
+                if pending_scale is not None:
+                    W, b = pending_scale[:, None] * W, pending_shift @ W + b
+                    pending_scale, pending_shift = None, None
+                self.layers.append((W, b, self.ACTIVATIONS[config["activation"]]))
+            elif kind == "BatchNormalization":
+                gamma = weights.pop(0) if config["scale"] else 1.0
+                beta = weights.pop(0) if config["center"] else 0.0
+                moving_mean, moving_var = weights
+                scale = (gamma / np.sqrt(moving_var + config["epsilon"])).astype(np.float32)
+                shift = (beta - moving_mean * scale).astype(np.float32)
+                if pending_scale is not None:
+                    scale, shift = pending_scale * scale, pending_shift * scale + shift
+                pending_scale, pending_shift = scale, shift
+            else:
+                raise ValueError(f"unsupported layer type {kind}")
+        if pending_scale is not None: # Trailing BatchNormalization: identity Dense carrying the affine
+            self.layers.append((np.diag(pending_scale), pending_shift, self.ACTIVATIONS["linear"]))
+
+    def __call__(self, x):
+        h = np.asarray(x, dtype=np.float32)
+        for W, b, activation in self.layers:
+            h = activation(h @ W + b)
+        return h
+
+# === Keras Graph Inference ===
+class KerasGraphModel:
+    """
+    Runs a Keras model through an XLA-compiled concrete tf.function with a
+    fixed batch-size-1 signature. It is called once on zeros here, so tracing
+    and compilation are not paid on the first request.
+    """
+    def __init__(self, model):
+        self.input_spec = tf.TensorSpec((1,) + tuple(model.input_shape[1:]), tf.float32)
+        self.graph_fn = tf.function(lambda x: model(x, training=False), jit_compile=True).get_concrete_function(self.input_spec)
+        self.graph_fn(tf.zeros(self.input_spec.shape, tf.float32))
+
+    def __call__(self, x):
+        return self.graph_fn(tf.constant(x, dtype=tf.float32)).numpy()
+
+# === Model Runners ===
+@load_once
+def get_model_runner(name):
+    """
+    Loads model `name` on first use and returns a callable for single-sample
+    predictions on the fastest available backend:
+      1. a NumpyMLP for the tiny models listed in NUMPY_MODELS,
+      2. a TensorRT engine (CUDA GPUs with TensorRT installed),
+      3. a quantized MODELS_DIR/<name>-<hash>.tflite file matching the current .h5,
+      4. a KerasGraphModel (XLA-compiled, warmed-up concrete tf.function),
+      5. Keras predict().
+    Returns None if the model can't be loaded at all. A model whose input
+    shape doesn't match what the app feeds it is reported here, once.
+    """
+    model = load_keras_model(name)
+    if model is None: return None
+    if tuple(model.input_shape[1:]) != MODEL_INPUT_SHAPES[name]:
+        print(f"[X] ERROR: {name} expects inputs of shape {tuple(model.input_shape[1:])}, but the app prepares "
+              f"{MODEL_INPUT_SHAPES[name]}. Its predictions will fail (and count as neutral in fusion) until they match.")
+    if name in NUMPY_MODELS:
+        try:
+            runner = NumpyMLP(model)
+            print(f"[✓] {name} compiled to NumPy matmuls.")
+            return runner
+        except ValueError as e:
+            print(f"[Info] {name} is not a plain MLP ({e}); using a framework backend.")
+    if trt is not None:
+        try:
+            runner = build_trt_engine(name)
+            print(f"[✓] TensorRT engine ready for {name}.")
+            return runner
+        except Exception as e:
+            print(f"[X] ERROR: Could not build TensorRT engine for {name}. Error: {e}")
+    try:
+        tflite_path = MODELS_DIR / f"{name}-{model_fingerprint(name)}.tflite"
+        if tflite_path.exists():
+            runner = TFLiteModel(tflite_path)
+            print(f"[✓] Quantized TFLite model loaded for {name}.")
+            return runner
+    except Exception as e:
+        print(f"[X] ERROR: Could not load the TFLite model for {name}. Falling back to Keras. Error: {e}")
+
+    try:
+        return KerasGraphModel(model)
+    except Exception as e:
+        print(f"[X] ERROR: Could not trace {name}. Falling back to Keras predict. Error: {e}")
+        return lambda x: model.predict(x, verbose=0)
+
+def preload_models():
+    """Warms up the slowest-loading models in the background so the first report/transcription is fast."""
+    load_whisper_model()
+    get_model_runner("facial_model")
+    get_model_runner("audio_model")
 
 
 # === Core Processing Functions ===
 def scan_bt_data():
+    """Logs the newest reading collected by the serial reader thread since the last scan."""
     global latest_line, sensor_log
     if bt_serial is None or not bt_serial.is_open:
         return "Bluetooth not connected. Select a port first. 🚫", sensor_log
-    try:
-        line = bt_serial.readline().decode('utf-8', errors='replace').strip()
-        if not line:
+    if serial_reader_error is not None:
+        return f"Error reading from Bluetooth: {str(serial_reader_error)} ❌", sensor_log
+    readings = sensor_readings # The deque is replaced on reconnect
+    with sensor_readings_lock:
+        if not readings:
             return "No new data received from ESP32. (Check connection/transmission) ⏳", sensor_log
-        try:
-            parsed_data = json.loads(line)
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            sensor_log[timestamp] = parsed_data
-            latest_line = line
-            return f"Time: {timestamp}\nData: {line} ✅", sensor_log
-        except json.JSONDecodeError:
-            return f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\nInvalid Data Format: {line} ⚠️", sensor_log
-    except Exception as e:
-        return f"Error reading from Bluetooth: {str(e)} ❌", sensor_log
+        received_at, parsed_data, line = readings.pop()
+        readings.clear() # Older readings are superseded by this one
+    timestamp = received_at.strftime("%Y-%m-%d %H:%M:%S")
+    sensor_log[timestamp] = parsed_data
+    latest_line = line
+    return f"Time: {timestamp}\nData: {line} ✅", sensor_log
+
+def latest_sensor_line():
+    """The newest raw JSON line from the ESP32: unscanned reader data first, else the last scanned line."""
+    try:
+        return sensor_readings[-1][2]
+    except IndexError:
+        return latest_line
 
 def transcribe_on_audio_change(audio_file_path):
-    if whisper_model is None: return "[ASR Error: Whisper model not loaded. 🚫]"
     if audio_file_path is None: return ""
+    whisper_model = load_whisper_model()
+    if whisper_model is None: return "[ASR Error: Whisper model not loaded. 🚫]"
     try:
-        result = whisper_model.transcribe(audio_file_path)
-        return result["text"]
+        # Greedy decoding; the VAD filter skips silent frames entirely.
+        segments, _ = whisper_model.transcribe(audio_file_path, beam_size=1, vad_filter=True)
+        return " ".join(segment.text.strip() for segment in segments)
     except Exception as e:
         return f"[ASR Error: {str(e)} ❌]"
 
-def text_to_speech_gtts(text_to_speak, lang='en'):
+def prune_tts_cache():
+    """Deletes cached TTS clips older than TTS_CACHE_MAX_AGE, then the oldest ones until the cache fits TTS_CACHE_MAX_BYTES."""
+    now, clips = time.time(), []
+    for path in TTS_CACHE_DIR.glob("*.mp3"):
+        try:
+            stat = path.stat()
+            if now - stat.st_mtime >= TTS_CACHE_MAX_AGE: path.unlink()
+            else: clips.append((stat.st_mtime, stat.st_size, path))
+        except OSError:
+            pass # Already removed by another thread
+    total_size = sum(size for _, size, _ in clips)
+    for _, size, path in sorted(clips):
+        if total_size <= TTS_CACHE_MAX_BYTES: break
+        try:
+            path.unlink()
+        except OSError:
+            pass
+        total_size -= size
+
+def synthesize_speech(text_to_speak, lang='en'):
+    """
+    Returns the gTTS MP3 bytes for `text_to_speak`, or None on failure.
+    Clips are cached in TTS_CACHE_DIR keyed by sha1(lang + text), so repeated
+    sentences skip the round-trip to Google. The cache is pruned on every write.
+    """
+    cache_key = hashlib.sha1(f"{lang}:{text_to_speak}".encode("utf-8")).hexdigest()
+    cache_path = TTS_CACHE_DIR / f"{cache_key}.mp3"
+    try:
+        if time.time() - cache_path.stat().st_mtime < TTS_CACHE_MAX_AGE:
+            return cache_path.read_bytes()
+    except OSError:
+        pass
     try:
-        tts = gTTS(text=text_to_speak, lang=lang, tld='co.uk', slow=False)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_audio_file:
-            temp_path = temp_audio_file.name
-        tts.save(temp_path)
-        return temp_path
+        mp3_buffer = io.BytesIO()
+        gTTS(text=text_to_speak, lang=lang, tld='co.uk', slow=False).write_to_fp(mp3_buffer)
+        mp3_bytes = mp3_buffer.getvalue()
     except Exception as e:
         print(f"Error during TTS generation: {e}")
         return None
-
-def predict_facial(photo_path):
-    if facial_model is None: return "Error: Facial model not loaded. 🚫", 0.5
-    if photo_path is None: return "Error: No facial image provided. 📸", 0.5
     try:
-        img = cv2.imread(str(photo_path))
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        resized = cv2.resize(gray, (48, 48))
-        input_img = (resized / 255.0).reshape(1, 48, 48, 1)
-        prediction = facial_model.predict(input_img, verbose=0)
-        class_id = np.argmax(prediction)
-        label = "Stressed" if class_id == 1 else "Not Stressed"
-        return label, float(prediction[0][class_id])
+        # Write-then-rename so concurrent readers never see a partial clip.
+        TTS_CACHE_DIR.mkdir(exist_ok=True)
+        temp_path = cache_path.with_suffix(f".{threading.get_ident()}.tmp")
+        temp_path.write_bytes(mp3_bytes)
+        os.replace(temp_path, cache_path)
+        prune_tts_cache()
+    except OSError as e:
+        print(f"Could not cache TTS clip: {e}")
+    return mp3_bytes
+
+def save_speech(mp3_segments):
+    """Writes MP3 segments back-to-back into one temp file (MP3 frames concatenate cleanly)."""
+    mp3_segments = [segment for segment in mp3_segments if segment]
+    if not mp3_segments: return None
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_audio_file:
+        for segment in mp3_segments:
+            temp_audio_file.write(segment)
+        return temp_audio_file.name
+
+def facial_input(photo_path):
+    """Facial model input for an image file: 48x48 grayscale scaled to [0, 1]."""
+    gray = cv2.imread(str(photo_path), cv2.IMREAD_GRAYSCALE)
+    resized = cv2.resize(gray, (48, 48), interpolation=cv2.INTER_AREA)
+    input_img = np.empty((1, 48, 48, 1), dtype=np.float32)
+    np.multiply(resized, np.float32(1.0 / 255.0), out=input_img.reshape(48, 48))
+    return input_img
+
+def prepare_facial(photo_path):
+    """Returns (facial model input, None), or (None, error result) if there's nothing to predict."""
+    if photo_path is None: return None, ("Error: No facial image provided. 📸", 0.5)
+    if get_model_runner("facial_model") is None: return None, ("Error: Facial model not loaded. 🚫", 0.5)
+    try:
+        return facial_input(photo_path), None
     except Exception as e:
-        return f"Error processing facial image: {str(e)} 🚨", 0.5
+        return None, (f"Error processing facial image: {str(e)} 🚨", 0.5)
+
+def interpret_facial(prediction):
+    class_id = np.argmax(prediction)
+    label = "Stressed" if class_id == 1 else "Not Stressed"
+    return label, float(prediction[0][class_id])
 
-def predict_audio(audio_file):
-    if audio_model is None: return "Error: Audio model not loaded. 🚫", 0.5
-    if audio_file is None: return "Error: No audio file provided. 🎙️", 0.5
+def load_audio(audio_file):
+    """Decodes an audio file to mono float32 at AUDIO_SAMPLE_RATE."""
+    try:
+        y, orig_sr = sf.read(audio_file, dtype='float32', always_2d=False)
+    except RuntimeError:
+        # Formats libsndfile can't decode (e.g. some MP3/M4A) go through librosa/audioread.
+        return librosa.load(audio_file, sr=AUDIO_SAMPLE_RATE)[0]
+    if y.ndim > 1: y = y.mean(axis=1)
+    if orig_sr != AUDIO_SAMPLE_RATE:
+        y = librosa.resample(y, orig_sr=orig_sr, target_sr=AUDIO_SAMPLE_RATE, res_type='soxr_hq')
+    return y
+
+def torchaudio_mfcc_transform():
+    """
+    torchaudio MFCC transform configured to match librosa.feature.mfcc's
+    defaults (Slaney mel filterbank, power spectrogram in dB with top_db=80,
+    orthonormal DCT-II). check_mfcc_parity.py compares the two.
+    """
+    import torchaudio
+    return torchaudio.transforms.MFCC(
+        sample_rate=AUDIO_SAMPLE_RATE, n_mfcc=MFCC_SHAPE[0],
+        melkwargs={"n_fft": 2048, "hop_length": 512, "n_mels": 128, "center": True, "pad_mode": "constant",
+                   "power": 2.0, "mel_scale": "slaney", "norm": "slaney"},
+    )
+
+@load_once
+def load_gpu_mfcc():
+    """
+    Returns a function computing MFCCs with torchaudio on CUDA, or None unless
+    USE_GPU_MFCC is set and torchaudio and a CUDA GPU are available. It is
+    opt-in because the audio model was trained on librosa features. torch is
+    imported here rather than at startup because it is slow to import.
+    """
+    if not USE_GPU_MFCC: return None
     try:
-        y, sr = librosa.load(audio_file, sr=22050)
-        mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=38)
-        target_length = 98
-        if mfccs.shape[1] < target_length:
-            mfccs = np.pad(mfccs, ((0, 0), (0, target_length - mfccs.shape[1])), mode='constant')
-        else:
-            mfccs = mfccs[:, :target_length]
-        mfccs = np.expand_dims(mfccs, axis=(0, -1))
-        prediction = audio_model.predict(mfccs, verbose=0)[0][0]
-        label = "Stressed" if prediction >= 0.5 else "Not Stressed"
-        confidence = prediction if prediction >= 0.5 else 1 - prediction
-        return label, confidence
+        import torch
+        if not torch.cuda.is_available():
+            print("[Info] No CUDA GPU for MFCC extraction, using librosa.")
+            return None
+        mfcc_transform = torchaudio_mfcc_transform().to("cuda")
     except Exception as e:
-        return f"Error processing audio: {str(e)} 🚨", 0.5
+        print(f"[Info] GPU MFCC extraction unavailable, using librosa. ({e})")
+        return None
+
+    def gpu_mfcc(y):
+        with torch.inference_mode():
+            return mfcc_transform(torch.from_numpy(y).to("cuda")).cpu().numpy()
+    print("[✓] GPU MFCC extraction (torchaudio) enabled.")
+    return gpu_mfcc
+
+def compute_mfcc(y):
+    """MFCCs of a mono AUDIO_SAMPLE_RATE signal, on the GPU when available."""
+    gpu_mfcc = load_gpu_mfcc()
+    if gpu_mfcc is not None:
+        try:
+            return gpu_mfcc(y)
+        except Exception as e:
+            print(f"GPU MFCC extraction failed, using librosa: {e}")
+    return librosa.feature.mfcc(y=y, sr=AUDIO_SAMPLE_RATE, n_mfcc=MFCC_SHAPE[0])
 
-def predict_dass21(q_responses):
-    if dass21_model is None or dass21_scaler is None: return "Error: DASS-21 model/scaler not loaded. 🚫", 0.5
+@functools.lru_cache(maxsize=8)
+def extract_audio_features(audio_file, mtime):
+    """
+    Decodes one recording and computes its MFCCs. Cached so pressing "Get My
+    Report" again on the same recording skips decoding and feature extraction;
+    `mtime` is part of the key so a re-recorded file at the same path is re-read.
+    """
+    mfccs = compute_mfcc(load_audio(audio_file))
+    mfccs.flags.writeable = False # Shared between callers through the cache
+    return mfccs
+
+def audio_input(mfccs, shape=MFCC_SHAPE):
+    """Audio model input for an MFCC matrix, zero-padded/truncated to `shape` (n_mfcc, frames)."""
+    mfcc_input = np.zeros((1,) + tuple(shape) + (1,), dtype=np.float32)
+    n_mfcc, n_frames = min(mfccs.shape[0], shape[0]), min(mfccs.shape[1], shape[1])
+    mfcc_input[0, :n_mfcc, :n_frames, 0] = mfccs[:n_mfcc, :n_frames]
+    return mfcc_input
+
+def prepare_audio(audio_file):
+    """Returns (audio model input, None), or (None, error result) if there's nothing to predict."""
+    if audio_file is None: return None, ("Error: No audio file provided. 🎙️", 0.5)
+    if get_model_runner("audio_model") is None: return None, ("Error: Audio model not loaded. 🚫", 0.5)
+    try:
+        mfccs = extract_audio_features(str(audio_file), os.path.getmtime(audio_file))
+        return audio_input(mfccs), None
+    except Exception as e:
+        return None, (f"Error processing audio: {str(e)} 🚨", 0.5)
+
+def interpret_binary(prediction):
+    """Label and confidence for a single sigmoid output (audio and physio models)."""
+    prediction = prediction[0][0]
+    label = "Stressed" if prediction >= 0.5 else "Not Stressed"
+    return label, (prediction if prediction >= 0.5 else 1 - prediction)
+
+def dass21_input(q_responses, dass21_scaler):
+    """DASS-21 model input for 21 answers (0-3), standardized with the (mean, 1 / scale) scaler coefficients."""
+    X = np.array([float(r) for r in q_responses], dtype=np.float32).reshape(1, -1)
+    dass21_mean, dass21_inv_scale = dass21_scaler
+    return (X - dass21_mean) * dass21_inv_scale
+
+def prepare_dass21(q_responses):
+    """Returns (DASS-21 model input, None), or (None, error result) if there's nothing to predict."""
+    dass21_runner, dass21_scaler = get_model_runner("dass21_model"), load_dass21_scaler()
+    if dass21_runner is None or dass21_scaler is None: return None, ("Error: DASS-21 model/scaler not loaded. 🚫", 0.5)
     try:
         if not all(r is not None for r in q_responses):
-            return "Error: All 21 DASS-21 questions must be answered. 📝", 0.5
-        X = np.array([float(r) for r in q_responses]).reshape(1, -1)
-        X_scaled = dass21_scaler.transform(X)
-        pred_prob = dass21_model.predict(X_scaled, verbose=0)[0][0]
-        label = "Stressed" if pred_prob >= 0.5 else "Not Stressed"
-        return label, pred_prob
+            return None, ("Error: All 21 DASS-21 questions must be answered. 📝", 0.5)
+        return dass21_input(q_responses, dass21_scaler), None
     except Exception as e:
-        return f"Error with DASS-21 input: {str(e)} 🚨", 0.5
-
-def predict_physio_from_line(line):
-    if physio_model is None or physio_scaler is None: return "Error: Physio model/scaler not loaded. 🚫", 0.5
-    if not line: return "Physio: No data available from ESP32. ⏳", 0.5
+        return None, (f"Error with DASS-21 input: {str(e)} 🚨", 0.5)
+
+def interpret_dass21(prediction):
+    pred_prob = prediction[0][0]
+    label = "Stressed" if pred_prob >= 0.5 else "Not Stressed"
+    return label, pred_prob
+
+def physio_input(line, physio_scaler):
+    """Physio model input for one ESP32 JSON line, standardized with the (mean, 1 / scale) scaler coefficients."""
+    data = orjson.loads(line)
+    input_data = np.fromiter((float(data.get(k, 0)) for k in PHYSIO_KEYS), dtype=np.float32, count=len(PHYSIO_KEYS)).reshape(1, -1)
+    physio_mean, physio_inv_scale = physio_scaler
+    return (input_data - physio_mean) * physio_inv_scale
+
+def prepare_physio(line):
+    """Returns (physio model input, None), or (None, error result) if there's nothing to predict."""
+    if not line: return None, ("Physio: No data available from ESP32. ⏳", 0.5)
+    physio_runner, physio_scaler = get_model_runner("physio_model"), load_physio_scaler()
+    if physio_runner is None or physio_scaler is None: return None, ("Error: Physio model/scaler not loaded. 🚫", 0.5)
     try:
-        data = json.loads(line)
-        input_data = np.array([[float(data.get(k, 0)) for k in ["eda_raw", "bvp_ir_raw", "temp_c", "acc_x_raw", "acc_y_raw", "acc_z_raw"]]])
-        input_scaled = physio_scaler.transform(input_data)
-        prediction = physio_model.predict(input_scaled, verbose=0)[0][0]
-        label = "Stressed" if prediction >= 0.5 else "Not Stressed"
-        return label, (prediction if prediction >= 0.5 else 1 - prediction)
-    except (json.JSONDecodeError, KeyError, ValueError) as e:
-        return f"Physio: Data format error ({type(e).__name__}). ⚠️", 0.5
+        return physio_input(line, physio_scaler), None
+    except (orjson.JSONDecodeError, KeyError, ValueError) as e:
+        return None, (f"Physio: Data format error ({type(e).__name__}). ⚠️", 0.5)
     except Exception as e:
-        return "Physio: Prediction error. 🚨", 0.5
+        return None, ("Physio: Prediction error. 🚨", 0.5)
+
+# Model name -> (input preparation, output interpretation, inference error label), in fusion order.
+MODALITIES = {
+    "audio_model": (prepare_audio, interpret_binary, lambda e: f"Error processing audio: {str(e)} 🚨"),
+    "facial_model": (prepare_facial, interpret_facial, lambda e: f"Error processing facial image: {str(e)} 🚨"),
+    "physio_model": (prepare_physio, interpret_binary, lambda e: "Physio: Prediction error. 🚨"),
+    "dass21_model": (prepare_dass21, interpret_dass21, lambda e: f"Error with DASS-21 input: {str(e)} 🚨"),
+}
+
+def predict_modality(name, arg):
+    """Prepares `arg` for model `name`, runs the model and interprets its output as (label, confidence)."""
+    prepare, interpret, error_label = MODALITIES[name]
+    x, error_result = prepare(arg)
+    if x is None: return error_result
+    try:
+        return interpret(get_model_runner(name)(x))
+    except Exception as e:
+        return error_label(e), 0.5
+
+def predict_all_modalities(audio_file, photo_path, physio_line, dass_input):
+    """
+    Returns the (label, confidence) of every modality, in MODALITIES order.
+    The modalities run concurrently, so decoding and preprocessing (file I/O,
+    OpenCV, librosa) and the forward passes of different models overlap.
+    """
+    modality_args = {"audio_model": audio_file, "facial_model": photo_path, "physio_model": physio_line, "dass21_model": dass_input}
+    with ThreadPoolExecutor(max_workers=len(MODALITIES)) as executor:
+        futures = [executor.submit(predict_modality, name, arg) for name, arg in modality_args.items()]
+        return [future.result() for future in futures]
 
 # === Fusion Logic and LLM Interaction ===
 def get_stress_confidence(label, confidence):
@@ -290,20 +844,40 @@ def agreement_fusion(confidences):
     valid_confidences = [c for c in confidences if c != 0.5]
     if not valid_confidences: return 0.5
     if len(valid_confidences) == 1: return valid_confidences[0]
-    M = len(valid_confidences)
-    agree_scores = [sum(1 - abs(valid_confidences[i] - valid_confidences[j]) for j in range(M) if i != j) / (M - 1) for i in range(M)]
-    sum_agree = sum(agree_scores)
-    if sum_agree < 1e-9: return np.mean(valid_confidences)
-    return float(np.sum(np.array(agree_scores) * np.array(valid_confidences)) / sum_agree)
+    valid = np.asarray(valid_confidences, dtype=np.float64)
+    M = valid.size
+    # Pairwise disagreement |c_i - c_j|; the diagonal is zero, so each row sums over j != i.
+    diff = np.abs(valid[:, None] - valid[None, :])
+    agree_scores = (M - 1 - diff.sum(axis=1)) / (M - 1)
+    sum_agree = agree_scores.sum()
+    if sum_agree < 1e-9: return float(valid.mean())
+    return float(agree_scores @ valid / sum_agree)
+
+def stream_coach_reply(prompt):
+    """Yields the AI coach's reply from Ollama piece by piece as it is generated."""
+    payload = {"model": OLLAMA_MODEL_NAME, "messages": [{"role": "user", "content": prompt}], "stream": True}
+    with OLLAMA_SESSION.post(f"{OLLAMA_API_URL}/api/chat", json=payload, stream=True, timeout=180) as response:
+        response.raise_for_status()
+        if "ndjson" not in response.headers.get("Content-Type", ""):
+            # Server ignored "stream": the whole reply arrives as a single JSON object.
+            yield response.json().get('message', {}).get('content', '')
+            return
+        for line in response.iter_lines():
+            if not line: continue
+            chunk = json.loads(line)
+            if "error" in chunk: raise RuntimeError(chunk["error"])
+            yield chunk.get('message', {}).get('content', '')
+            if chunk.get('done'): break
 
 def fused_stress_prediction(audio_file, photo_path, user_input, *dass_input):
+    """
+    Generator for the report button: yields the report with the coach's reply
+    filling in as it streams, then a final update with the spoken reply.
+    Each complete sentence is sent to gTTS while the LLM is still generating.
+    """
     try:
-        audio_label, audio_conf = predict_audio(audio_file)
-        facial_label, facial_conf = predict_facial(photo_path)
-        physio_label, physio_conf = predict_physio_from_line(latest_line)
-        survey_label, survey_conf = predict_dass21(dass_input)
-        
-        confidences = [get_stress_confidence(l, c) for l, c in [(audio_label, audio_conf), (facial_label, facial_conf), (physio_label, physio_conf), (survey_label, survey_conf)]]
+        modality_results = predict_all_modalities(audio_file, photo_path, latest_sensor_line(), dass_input)
+        confidences = [get_stress_confidence(l, c) for l, c in modality_results]
         fused_score = agreement_fusion(confidences)
         overall_label = "Stressed" if fused_score >= 0.5 else "Not Stressed"
         
@@ -312,22 +886,39 @@ def fused_stress_prediction(audio_file, photo_path, user_input, *dass_input):
                        f"- **Confidence of being Stressed:** `{fused_score:.2f}` (0.0 to 1.0)\n"
                        f"- **Overall Assessment:** **`{overall_label}`**\n\n")
 
+        result_text += "**💬 Your AI Coach, Safe Space, says:**\n"
+        yield result_text, None
+
         llm_response = "The AI coach is currently unavailable. 🤖😴"
-        if OLLAMA_API_URL:
-            try:
-                prompt = f"""[INSTRUCTION] You are "Safe Space", a compassionate AI mental health coach. Analyze the user's data: - Stress Score: {int(fused_score * 100)}% - User's Words: "{user_input if user_input else 'Not provided.'}" Based on this, classify their stress (No Stress, Eustress, Mild/Moderate/Severe Distress) and provide 3-5 short, empathetic, and actionable tips in under 300 words. Be warm and supportive. Respond only with the analysis. [/INSTRUCTION]"""
-                payload = {"model": OLLAMA_MODEL_NAME, "messages": [{"role": "user", "content": prompt}], "stream": False}
-                response = requests.post(f"{OLLAMA_API_URL}/api/chat", json=payload, timeout=180)
-                response.raise_for_status()
-                llm_response = response.json().get('message', {}).get('content', 'No response content. 😞')
-            except Exception as e:
-                llm_response = f"Could not reach the AI coach. Please ensure Ollama is running.\nError: {e}"
-
-        result_text += f"**💬 Your AI Coach, Safe Space, says:**\n{llm_response}"
-        audio_output = text_to_speech_gtts(llm_response)
-        return result_text, audio_output
+        speech_futures = []
+        tts_executor = ThreadPoolExecutor(max_workers=4)
+        try:
+            if OLLAMA_API_URL:
+                try:
+                    prompt = f"""[INSTRUCTION] You are "Safe Space", a compassionate AI mental health coach. Analyze the user's data: - Stress Score: {int(fused_score * 100)}% - User's Words: "{user_input if user_input else 'Not provided.'}" Based on this, classify their stress (No Stress, Eustress, Mild/Moderate/Severe Distress) and provide 3-5 short, empathetic, and actionable tips in under 300 words. Be warm and supportive. Respond only with the analysis. [/INSTRUCTION]"""
+                    llm_response, pending_text = "", ""
+                    for piece in stream_coach_reply(prompt):
+                        llm_response += piece
+                        *sentences, pending_text = SENTENCE_END.split(pending_text + piece)
+                        speech_futures += [tts_executor.submit(synthesize_speech, sentence) for sentence in sentences]
+                        yield result_text + llm_response, None
+                    if pending_text.strip():
+                        speech_futures.append(tts_executor.submit(synthesize_speech, pending_text))
+                    if not llm_response: llm_response = 'No response content. 😞'
+                except Exception as e:
+                    llm_response = f"Could not reach the AI coach. Please ensure Ollama is running.\nError: {e}"
+                    speech_futures = []
+
+            if not speech_futures:
+                speech_futures.append(tts_executor.submit(synthesize_speech, llm_response))
+            audio_output = save_speech(future.result() for future in speech_futures)
+        finally:
+            # Also runs on GeneratorExit when the user leaves mid-stream: drop queued
+            # sentences instead of waiting for them to be synthesized.
+            tts_executor.shutdown(wait=False, cancel_futures=True)
+        yield result_text + llm_response, audio_output
     except Exception as e:
-        return f"## ⚠️ An Application Error Occurred\n\nError: {str(e)} 💥", None
+        yield f"## ⚠️ An Application Error Occurred\n\nError: {str(e)} 💥", None
 
 # === Gradio Interface Definition ===
 def create_gradio_interface():
@@ -413,5 +1004,6 @@ def create_gradio_interface():
 
 if __name__ == "__main__":
     app = create_gradio_interface()
+    threading.Thread(target=preload_models, daemon=True).start()
     app.launch(inbrowser=True, share=False)
 
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Safe Space - GPU MFCC Parity Check
+
+The audio model was trained on librosa MFCCs. SafeSpace_final.py can compute
+them with torchaudio on a CUDA GPU instead. This script checks
+that both produce the same features, on a few synthetic signals plus any
+audio files given on the command line (decoded with the app's load_audio).
+It exits with status 1 if any coefficient differs by more than TOLERANCE.
+GPU MFCCs are only used once enabled with SAFESPACE_GPU_MFCC=1, which should
+be set only on hosts where this check passes.
+
+Usage:
+    python check_mfcc_parity.py [recording.wav ...]
+"""
+
+# === Imports ===
+import sys
+import librosa
+import numpy as np
+import torch
+from SafeSpace_final import AUDIO_SAMPLE_RATE, MFCC_SHAPE, torchaudio_mfcc_transform, load_audio
+
+# === Configuration ===
+TOLERANCE = 0.05 # Max abs difference allowed per MFCC coefficient
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+rng = np.random.default_rng(0)
+
+def test_signals():
+    """(name, mono float32 signal at AUDIO_SAMPLE_RATE) pairs."""
+    t = np.arange(3 * AUDIO_SAMPLE_RATE) / AUDIO_SAMPLE_RATE
+    yield "sine 440 Hz", (0.5 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+    yield "chirp 100 Hz-8 kHz", (0.5 * np.sin(2 * np.pi * (100 * t + (8000 - 100) / 6 * t ** 2))).astype(np.float32)
+    yield "white noise", rng.normal(0.0, 0.1, size=t.size).astype(np.float32)
+    yield "near silence", rng.normal(0.0, 1e-4, size=t.size).astype(np.float32)
+    for path in sys.argv[1:]:
+        yield path, load_audio(path)
+
+if __name__ == "__main__":
+    mfcc_transform = torchaudio_mfcc_transform().to(DEVICE)
+    all_passed = True
+    for name, y in test_signals():
+        expected = librosa.feature.mfcc(y=y, sr=AUDIO_SAMPLE_RATE, n_mfcc=MFCC_SHAPE[0])
+        with torch.inference_mode():
+            actual = mfcc_transform(torch.from_numpy(y).to(DEVICE)).cpu().numpy()
+        if actual.shape != expected.shape:
+            print(f"[X] ERROR: {name}: shape {actual.shape} (torchaudio) != {expected.shape} (librosa)")
+            all_passed = False
+            continue
+        max_abs_diff = float(np.max(np.abs(actual - expected)))
+        passed = max_abs_diff <= TOLERANCE
+        all_passed &= passed
+        print(f"[{'✓' if passed else 'X'}] {name}: max abs diff {max_abs_diff:.5f} (MFCC range {expected.min():.1f} to {expected.max():.1f}, {DEVICE})")
+    sys.exit(0 if all_passed else 1)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Safe Space - Post-Training Model Quantization
+
+Converts the Keras models in `saved_models/` into quantized TensorFlow Lite
+flatbuffers (`saved_models/<model>-<hash>.tflite`, where <hash> identifies the
+source .h5 file). When a file matching the current .h5 exists,
+SafeSpace_final.py serves the model through the TFLite interpreter instead of
+Keras, which roughly halves weight memory traffic per prediction. Retraining
+a model changes its hash, so an outdated .tflite file is simply ignored.
+
+Inputs and outputs stay float32, so no changes are needed in the app.
+
+int8 calibration should use real inputs: pass `--samples DIR` with face
+photos (.jpg/.png), voice recordings (.wav/.mp3/...) and ESP32 readings
+(.jsonl, one JSON line per reading). They are turned into model inputs by
+the same functions the app's prepare_* steps use (facial_input, audio_input,
+physio_input). Modalities without samples fall back to synthetic inputs,
+which only roughly cover the real value ranges.
+
+After converting, every model is run on the calibration inputs in both
+float (Keras) and quantized (TFLite) form, and the max abs difference and
+label agreement are printed. Check these before deploying the files.
+
+Usage:
+    python quantize_models.py --samples DIR   # int8 weights and activations (default)
+    python quantize_models.py --fp16          # float16 weights, float32 compute
+"""
+
+# === Imports ===
+import argparse
+import cv2
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+from SafeSpace_final import (MODELS_DIR, MODEL_FILES, TFLiteModel, model_fingerprint, load_audio, compute_mfcc,
+                             load_dass21_scaler, load_physio_scaler, facial_input, audio_input, dass21_input, physio_input)
+
+# === Configuration ===
+NUM_CALIBRATION_SAMPLES = 100
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".ogg", ".flac", ".m4a"}
+rng = np.random.default_rng(0)
+
+# === Real Samples (through the same input transforms as the app's prepare_* functions) ===
+def sample_files(samples_dir, extensions):
+    if samples_dir is None: return []
+    return sorted(p for p in Path(samples_dir).rglob("*") if p.suffix.lower() in extensions)[:NUM_CALIBRATION_SAMPLES]
+
+def real_facial_samples(samples_dir):
+    for path in sample_files(samples_dir, IMAGE_EXTENSIONS):
+        try:
+            yield facial_input(path)
+        except cv2.error:
+            print(f"[Info] Skipping unreadable image {path.name}.")
+
+def real_audio_samples(samples_dir):
+    for path in sample_files(samples_dir, AUDIO_EXTENSIONS):
+        yield audio_input(compute_mfcc(load_audio(str(path))))
+
+def real_physio_samples(samples_dir):
+    physio_scaler = load_physio_scaler()
+    lines = (line for path in sample_files(samples_dir, {".jsonl"}) for line in path.read_bytes().splitlines() if line.strip())
+    for line in list(lines)[:NUM_CALIBRATION_SAMPLES]:
+        yield physio_input(line, physio_scaler)
+
+# === Synthetic Samples (fallback when no real samples are given) ===
+# These only approximate the real input distributions, so calibration and the
+# float-vs-quantized check below are less trustworthy with them.
+def synthetic_facial_samples(input_shape):
+    """Uniform noise images scaled to [0, 1]."""
+    for _ in range(NUM_CALIBRATION_SAMPLES):
+        yield rng.uniform(0.0, 1.0, size=(1,) + input_shape).astype(np.float32)
+
+def synthetic_audio_samples(input_shape):
+    """MFCCs of noise bursts at varying loudness, padded/truncated to the model's input shape."""
+    for _ in range(NUM_CALIBRATION_SAMPLES):
+        y = rng.normal(0.0, rng.uniform(0.01, 0.5), size=512 * input_shape[1]).astype(np.float32)
+        yield audio_input(compute_mfcc(y), shape=input_shape[:2])
+
+def synthetic_physio_samples(input_shape):
+    """Standard normal vectors (the physio scaler output is ~N(0, 1) on the training data)."""
+    for _ in range(NUM_CALIBRATION_SAMPLES):
+        yield rng.standard_normal(size=(1,) + input_shape).astype(np.float32)
+
+def dass21_samples(input_shape):
+    """Random 0-3 questionnaire answers (the full answer space), standardized like prepare_dass21."""
+    dass21_scaler = load_dass21_scaler()
+    for _ in range(NUM_CALIBRATION_SAMPLES):
+        yield dass21_input(rng.integers(0, 4, size=input_shape[0]), dass21_scaler)
+
+# Model name -> (real sample generator or None, synthetic sample generator)
+SAMPLE_GENERATORS = {
+    "facial_model": (real_facial_samples, synthetic_facial_samples),
+    "audio_model": (real_audio_samples, synthetic_audio_samples),
+    "dass21_model": (None, dass21_samples),
+    "physio_model": (real_physio_samples, synthetic_physio_samples),
+}
+
+def calibration_samples(name, input_shape, samples_dir):
+    """Returns a list of model inputs for `name`, real ones when available."""
+    real, synthetic = SAMPLE_GENERATORS[name]
+    samples = []
+    if real is not None and samples_dir is not None:
+        samples = [x for x in real(samples_dir) if x.shape[1:] == input_shape]
+        if not samples: print(f"[Info] No usable samples for {name} in {samples_dir}; using synthetic inputs.")
+    return samples or list(synthetic(input_shape))
+
+# === Conversion ===
+def quantize_model(name, samples_dir=None, fp16=False):
+    """
+    Converts one Keras model to a quantized .tflite file next to it and
+    compares it against the float model. Returns (path, max abs diff, label agreement).
+    """
+    model = tf.keras.models.load_model(MODELS_DIR / MODEL_FILES[name])
+    input_shape = tuple(model.input_shape[1:])
+    samples = calibration_samples(name, input_shape, samples_dir)
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if fp16:
+        converter.target_spec.supported_types = [tf.float16]
+    else:
+        converter.representative_dataset = lambda: ([x] for x in samples)
+    output_path = MODELS_DIR / f"{name}-{model_fingerprint(name)}.tflite"
+    output_path.write_bytes(converter.convert())
+
+    # Float vs quantized check on the same inputs.
+    quantized = TFLiteModel(output_path)
+    expected = np.concatenate([model.predict(x, verbose=0) for x in samples])
+    actual = np.concatenate([quantized(x) for x in samples])
+    max_abs_diff = float(np.max(np.abs(expected - actual)))
+    if expected.shape[1] > 1:
+        agreement = float(np.mean(expected.argmax(axis=1) == actual.argmax(axis=1)))
+    else:
+        agreement = float(np.mean((expected >= 0.5) == (actual >= 0.5)))
+    return output_path, max_abs_diff, agreement
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantize Safe Space models to TFLite.")
+    parser.add_argument("--fp16", action="store_true", help="Use float16 weights instead of int8.")
+    parser.add_argument("--samples", type=Path, help="Directory of real photos, recordings and ESP32 .jsonl logs for calibration.")
+    args = parser.parse_args()
+
+    for name in MODEL_FILES:
+        try:
+            path, max_abs_diff, agreement = quantize_model(name, samples_dir=args.samples, fp16=args.fp16)
+            print(f"[✓] {name} -> {path.name} ({path.stat().st_size / 1024:.0f} KB), "
+                  f"max abs diff vs float: {max_abs_diff:.4f}, label agreement: {agreement:.1%}")
+        except Exception as e:
+            print(f"[X] ERROR: Could not quantize {name}. Error: {e}")